@@ -0,0 +1,25 @@
+#!/bin/bash
+# Runs the BDD scenarios in parallel with behavex.
+# Usage: bin/behave-parallel.sh [number of workers]
+#
+# Worker N uses the Postgres schema behave_wN and talks to its own
+# service on port 8081 + N, which this script starts and stops.
+WORKERS=${1:-4}
+PIDS=""
+trap 'kill $PIDS 2>/dev/null' EXIT
+
+for w in $(seq 1 "$WORKERS"); do
+    PORT=$((8081 + w))
+    echo "*** Starting service for worker $w on port $PORT"
+    BEHAVE_WORKER_ID=$w gunicorn --bind 0.0.0.0:$PORT --log-level=warning wsgi:app &
+    PIDS="$PIDS $!"
+    # One at a time so the workers don't race each other creating pg_trgm
+    for _ in $(seq 1 30); do
+        curl -sf "http://localhost:$PORT/health" > /dev/null && break
+        sleep 1
+    done
+    curl -sf "http://localhost:$PORT/health" > /dev/null || { echo "Service for worker $w did not start"; exit 1; }
+done
+
+echo "*** Running behavex with $WORKERS workers"
+BEHAVE_POOL=1 behavex --parallel-processes "$WORKERS" --parallel-scheme scenario
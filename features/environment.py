@@ -2,56 +2,99 @@
 
 """
 Environment for Behave Testing
+
+Scenarios can be run in parallel with behavex using bin/behave-parallel.sh,
+which starts one service per worker. Worker N (1..number of processes)
+uses the Postgres schema behave_wN and the service on port 8081 + N.
+
+behavex runs before_all for every scenario, so the browser, app context
+and tables are set up once per process (see worker_state.py) and torn
+down when the process exits rather than in after_all.
 """
-from os import getenv
+from os import getenv, environ
+from multiprocessing import current_process
 from selenium import webdriver
-# ADD THESE IMPORTS:
-from service import app # Import the Flask app object
-from service.models import db, Product # Import db and Product model
+from sqlalchemy import text
+import worker_state  # features/ is on sys.path while behave runs
 
 WAIT_SECONDS = int(getenv('WAIT_SECONDS', '30'))
-# Use the correct port (8081 if you changed it)
-BASE_URL = getenv('BASE_URL', 'http://localhost:8081')
 DRIVER = getenv('DRIVER', 'firefox').lower()
+# Keep the schema between runs and truncate it instead of dropping it
+BEHAVE_POOL = getenv('BEHAVE_POOL', '0') == '1'
+
+
+def get_worker_id(context):
+    """ Returns this behavex worker's number (1..N), or 0 when running serially """
+    if getenv('BEHAVE_WORKER_ID'):
+        return int(getenv('BEHAVE_WORKER_ID'))
+    # behavex names its pool processes behave_worker-<n> and passes -D worker_id=<n>
+    if current_process().name.startswith('behave_worker-'):
+        return int(context.config.userdata['worker_id']) + 1
+    return 0
 
 
 def before_all(context):
     """ Executed once before all tests """
-    context.base_url = BASE_URL
+    worker_id = get_worker_id(context)
+    if worker_id:
+        # service/config.py reads this on import to select the worker's schema
+        environ['BEHAVE_WORKER_ID'] = str(worker_id)
+    # ADD THESE IMPORTS (only once the worker is known; the engine is built on import):
+    from service import app # Import the Flask app object
+    from service.models import db, Product # Import db and Product model
+
+    # Use the correct port (8081 if you changed it), offset per parallel worker
+    context.base_url = getenv('BASE_URL', f'http://localhost:{8081 + worker_id}')
     context.wait_seconds = WAIT_SECONDS
 
-    # -- INTIALIZE THE DATABASE AND APP CONTEXT --
     context.app = app.test_client()
-    app.app_context().push()
-    db.init_app(app)
-    db.create_all() # Make sure tables are created
+    if worker_state.driver is None:
+        # -- INTIALIZE THE DATABASE AND APP CONTEXT --
+        # Only once per process: under behavex every scenario is a run of its own
+        app.app_context().push()
+        if not BEHAVE_POOL or not db.inspect(db.engine).has_table(Product.__tablename__):
+            db.create_all() # Make sure tables are created
 
-    # Select browser
-    if 'firefox' in DRIVER:
-        context.driver = get_firefox()
-    else:
-        context.driver = get_chrome()
-    context.driver.implicitly_wait(context.wait_seconds)
+        # Select browser
+        if 'firefox' in DRIVER:
+            worker_state.driver = get_firefox()
+        else:
+            worker_state.driver = get_chrome()
+        # Rely on explicit WebDriverWait only; mixing in implicit waits stacks timeouts
+        worker_state.driver.implicitly_wait(0)
+        worker_state.at_process_exit(after_worker)
+    context.driver = worker_state.driver
     context.config.setup_logging()
 
 
-def after_all(context):
-    """ Executed after all tests """
-    # --- FIX: Explicitly drop dependent tables first ---
-    engine = db.get_engine()
-    inspector = db.inspect(engine)
-    if inspector.has_table(Product.__tablename__):
-         Product.__table__.drop(engine) # Drop the product table first
+def after_worker():
+    """ Executed once when the process exits, in place of an after_all hook """
+    from service.models import db, Product
+    if BEHAVE_POOL:
+        # Keep the pooled schema and just empty it for the next run
+        with db.engine.begin() as connection:
+            connection.execute(text(f"TRUNCATE {Product.__tablename__} RESTART IDENTITY CASCADE"))
+    else:
+        # --- FIX: Explicitly drop dependent tables first ---
+        engine = db.get_engine()
+        inspector = db.inspect(engine)
+        if inspector.has_table(Product.__tablename__):
+            Product.__table__.drop(engine) # Drop the product table first
 
-    db.drop_all() # Now drop the rest
-    # --- End Fix ---
-    context.driver.quit()
+        db.drop_all() # Now drop the rest
+        # --- End Fix ---
+    worker_state.driver.quit()
 
 
-def after_scenario(context, scenario):
-    """ Runs after each scenario to clear the database """
-    db.session.query(Product).delete()
-    db.session.commit()
+def before_scenario(context, scenario):
+    """ Runs before each scenario to reset the browser """
+    # The products themselves are reset over REST by the background step
+    context.elem_cache = {}
+    # Reuse the one browser for the whole run but start each scenario clean;
+    # storage can only be cleared once a page from the site is loaded
+    context.driver.delete_all_cookies()
+    context.driver.get(context.base_url)
+    context.driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
 
 ######################################################################
 # Utility functions to create web drivers
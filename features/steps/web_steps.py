@@ -21,6 +21,7 @@ Web Steps
 Steps file for web interactions with Selenium
 """
 import logging
+from functools import lru_cache
 from behave import when, then
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select, WebDriverWait
@@ -30,9 +31,28 @@ WAIT_SECONDS = 30
 ID_PREFIX = 'product_'
 
 
+@lru_cache(maxsize=128)
+def _eid(field_name):
+    """ Map a field name from the feature file to its HTML element id """
+    return ID_PREFIX + field_name.lower().replace(' ', '_')
+
+
+def _get(context, field_name):
+    """ Locate a form element once per page load and cache it """
+    element_id = _eid(field_name)
+    element = context.elem_cache.get(element_id)
+    if element is None:
+        element = WebDriverWait(context.driver, WAIT_SECONDS).until(
+            expected_conditions.presence_of_element_located((By.ID, element_id))
+        )
+        context.elem_cache[element_id] = element
+    return element
+
+
 @when('I visit the "Home Page"')
 def step_impl(context):
     """ Make a call to the base URL """
+    context.elem_cache.clear()
     context.driver.get(context.base_url)
 
 
@@ -51,8 +71,7 @@ def step_impl(context, message):
 @when(u'I set the "{field_name}" to "{value}"')
 def step_impl(context, field_name, value):
     """ Set the value of an input field """
-    element_id = ID_PREFIX + field_name.lower().replace(' ', '_')
-    element = context.driver.find_element(By.ID, element_id)
+    element = _get(context, field_name)
     element.clear()
     element.send_keys(value)
 
@@ -60,8 +79,8 @@ def step_impl(context, field_name, value):
 @when(u'I select "{value}" in the "{dropdown_name}" dropdown')
 def step_impl(context, value, dropdown_name):
     """ Select a value from a dropdown """
-    element_id = ID_PREFIX + dropdown_name.lower().replace(' ', '_')
-    select = Select(context.driver.find_element(By.ID, element_id))
+    element = _get(context, dropdown_name)
+    select = Select(element)
     select.select_by_visible_text(value)
 
 
@@ -70,30 +89,31 @@ def step_impl(context, value, dropdown_name):
 def step_impl(context, button):
     """ Press the button """
     button_id = button.lower().replace(' ', '_') + '-btn'
-    context.driver.find_element(By.ID, button_id).click()
+    context.elem_cache.clear()
+    WebDriverWait(context.driver, WAIT_SECONDS).until(
+        expected_conditions.presence_of_element_located((By.ID, button_id))
+    ).click()
 
 
 @then(u'I should see "{value}" in the "{field_name}" field')
 def step_impl(context, value, field_name):
     """ Check the value of an input field """
-    element_id = ID_PREFIX + field_name.lower().replace(' ', '_')
-    element = context.driver.find_element(By.ID, element_id)
+    element = _get(context, field_name)
     assert element.get_attribute('value') == value
 
 
 @then(u'I should see "{value}" in the "{dropdown_name}" dropdown')
 def step_impl(context, value, dropdown_name):
     """ Check the selected value of a dropdown """
-    element_id = ID_PREFIX + dropdown_name.lower().replace(' ', '_')
-    select = Select(context.driver.find_element(By.ID, element_id))
+    element = _get(context, dropdown_name)
+    select = Select(element)
     assert select.first_selected_option.text == value
 
 
 @then('the "{field_name}" field should be empty')
 def step_impl(context, field_name):
     """ Check if an input field is empty """
-    element_id = ID_PREFIX + field_name.lower().replace(' ', '_')
-    element = context.driver.find_element(By.ID, element_id)
+    element = _get(context, field_name)
     assert element.get_attribute('value') == ''
 
 
@@ -124,7 +144,9 @@ def step_impl(context, name):
 @then(u'I should not see "{name}" in the results')
 def step_impl(context, name):
     """ Check if the name is not in the search results """
-    element = context.driver.find_element(By.ID, 'search_results')
+    element = WebDriverWait(context.driver, WAIT_SECONDS).until(
+        expected_conditions.presence_of_element_located((By.ID, 'search_results'))
+    )
     assert name not in element.text
 
 
@@ -150,10 +172,7 @@ def step_impl(context, count):
 @when(u'I copy the "{field_name}" field')
 def step_impl(context, field_name):
     """ Copy text from an input field """
-    element_id = ID_PREFIX + field_name.lower().replace(' ', '_')
-    element = WebDriverWait(context.driver, WAIT_SECONDS).until(
-        expected_conditions.presence_of_element_located((By.ID, element_id))
-    )
+    element = _get(context, field_name)
     context.clipboard = element.get_attribute('value')
     logging.info('Copied "%s" from "%s"', context.clipboard, field_name)
     assert context.clipboard is not None
@@ -163,10 +182,7 @@ def step_impl(context, field_name):
 @then(u'I paste the "{field_name}" field')
 def step_impl(context, field_name):
     """ Paste text into an input field """
-    element_id = ID_PREFIX + field_name.lower().replace(' ', '_')
-    element = WebDriverWait(context.driver, WAIT_SECONDS).until(
-        expected_conditions.presence_of_element_located((By.ID, element_id))
-    )
+    element = _get(context, field_name)
     element.clear()
     element.send_keys(context.clipboard)
     logging.info('Pasted "%s" into "%s"', context.clipboard, field_name)
@@ -0,0 +1,20 @@
+"""
+Process-wide state for the behave hooks
+
+behave exec()s environment.py afresh for every run, and behavex with
+--parallel-scheme scenario starts one run per scenario in each worker
+process. This module is imported instead, so it is loaded once per
+process and what it holds outlives a single run.
+"""
+from multiprocessing import util
+
+# the browser shared by every run in this process, set by before_all
+driver = None
+
+
+def at_process_exit(callback):
+    """Runs callback once when this process shuts down"""
+    # behavex's pool workers leave through os._exit(), which skips atexit
+    # handlers; multiprocessing's own finalizers still run there and at
+    # normal interpreter exit
+    util.Finalize(None, callback, exitpriority=10)
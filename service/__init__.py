@@ -10,9 +10,11 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from service import config
 from service.common import log_handlers
+from service.common.json_provider import OrjsonProvider
 
 # Create Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Load configuration
 app.config.from_object(config)
@@ -2,6 +2,7 @@
 Models for Product Store Service
 """
 from enum import Enum
+from sqlalchemy import DDL, event, text
 from service import db  # Import db from __init__.py
 
 
@@ -20,9 +21,24 @@ class Category(Enum):
     OTHER = "Other"
 
 
+# Plain dict lookup is cheaper than Category[...] on every deserialize
+_CATEGORY_BY_NAME = {category.name: category for category in Category}
+# serialize_rows reads each row's category value from here instead of .value
+_CATEGORY_VALUE = {category: category.value for category in Category}
+
+
 class Product(db.Model):
     """Product model"""
     __tablename__ = "products"
+    __table_args__ = (
+        # trigram index so find_by_name's ilike('%name%') can avoid a seq scan
+        db.Index(
+            "ix_products_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+        db.Index("ix_products_category", "category"),
+        db.Index("ix_products_available", "available"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -31,12 +47,18 @@ class Product(db.Model):
     available = db.Column(db.Boolean, default=True)
     price = db.Column(db.Float, nullable=False)
 
+    def __repr__(self):
+        return f"<Product {self.name} id=[{self.id}]>"
+
     def create(self):
         db.session.add(self)
         db.session.commit()
 
-    def update(self):
-        db.session.commit()
+    def update(self, commit=True):
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
 
     def delete(self):
         db.session.delete(self)
@@ -52,15 +74,36 @@ class Product(db.Model):
             "price": self.price,
         }
 
+    @classmethod
+    def serialize_rows(cls, rows):
+        """Serializes many products at once for the list endpoints"""
+        category_value = _CATEGORY_VALUE
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "category": category_value[row.category],
+                "available": row.available,
+                "price": row.price,
+            }
+            for row in rows
+        ]
+
     def deserialize(self, data):
         try:
             self.name = data["name"]
             self.description = data.get("description", "")
-            self.category = Category[data["category"].upper()]
+            category = _CATEGORY_BY_NAME.get(data["category"].upper())
+            if category is None:
+                raise DataValidationError(f"Invalid category: {data['category']}")
+            self.category = category
             self.available = data.get("available", True)
             self.price = float(data["price"])
         except KeyError as error:
-            raise DataValidationError(f"Missing key: {error}")
+            raise DataValidationError(f"Invalid product: missing {error.args[0]}")
+        except TypeError as error:
+            raise DataValidationError("Invalid product: body of request is not a dictionary") from error
         except ValueError as error:
             raise DataValidationError(f"Invalid value: {error}")
 
@@ -70,7 +113,7 @@ class Product(db.Model):
 
     @classmethod
     def find(cls, product_id):
-        return cls.query.get(product_id)
+        return db.session.get(cls, product_id)
 
     @classmethod
     def find_by_name(cls, name):
@@ -85,7 +128,21 @@ class Product(db.Model):
         return cls.query.filter_by(available=available).all()
 
 
+# The trigram operator class needs pg_trgm before the table is created. The
+# extension is database-wide, so pin it to public where every search_path sees it
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public").execute_if(dialect="postgresql"),
+)
+
+
 def init_db(app):
     """Initialize the database"""
     with app.app_context():
+        schema = app.config.get("DATABASE_SCHEMA")
+        if schema:
+            # must exist first or create_all falls through to public
+            with db.engine.begin() as connection:
+                connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
         db.create_all()
@@ -1,20 +1,27 @@
-from flask import jsonify, request, abort, url_for
+from itertools import islice
+import orjson
+from flask import jsonify, request, abort, url_for, Response, stream_with_context
 from service import app
 from service.models import Product, Category, db
 from service.common import status
 from flask import current_app
 
 WAIT_SECONDS = 30
+STREAM_BATCH_SIZE = 200
+# only the routes that read a JSON body; unmatched URLs and methods keep their 404/405
+JSON_ENDPOINTS = ("create_products", "create_products_bulk", "update_products")
 
-def check_content_type(content_type):
-    if "Content-Type" not in request.headers:
-        current_app.logger.error("No Content-Type specified.")
-        abort(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-              f"Content-Type must be {content_type}")
-    if request.headers["Content-Type"] != content_type:
-        current_app.logger.error("Invalid Content-Type: %s", request.headers["Content-Type"])
+def empty_204():
+    """Builds a bodiless 204 response without going through make_response"""
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+@app.before_request
+def enforce_json():
+    """Rejects product writes that are not sent as JSON"""
+    if request.endpoint in JSON_ENDPOINTS and not request.is_json:
+        current_app.logger.error("Invalid Content-Type: %s", request.content_type)
         abort(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-              f"Content-Type must be {content_type}")
+              "Content-Type must be application/json")
 
 @app.route("/health")
 def healthcheck():
@@ -26,7 +33,6 @@ def index():
 
 @app.route("/products", methods=["POST"])
 def create_products():
-    check_content_type("application/json")
     data = request.get_json()
     product = Product()
     product.deserialize(data)
@@ -35,6 +41,23 @@ def create_products():
     location_url = url_for("get_products", product_id=product.id, _external=True)
     return jsonify(product.serialize()), status.HTTP_201_CREATED, {"Location": location_url}
 
+@app.route("/products/bulk", methods=["POST"])
+def create_products_bulk():
+    data = request.get_json()
+    if not isinstance(data, list):
+        abort(status.HTTP_400_BAD_REQUEST, "Request body must be a list of products")
+    if not all(isinstance(item, dict) for item in data):
+        abort(status.HTTP_400_BAD_REQUEST, "Each product in the list must be an object")
+    products = []
+    for item in data:
+        product = Product()
+        product.deserialize(item)
+        products.append(product)
+    # one multi-row INSERT ... RETURNING id and a single commit
+    db.session.bulk_save_objects(products, return_defaults=True)
+    db.session.commit()
+    return jsonify(Product.serialize_rows(products)), status.HTTP_201_CREATED
+
 @app.route("/products", methods=["GET"])
 def list_products():
     name = request.args.get("name")
@@ -54,20 +77,38 @@ def list_products():
         available = available_str.lower() in ["true", "1", "yes"]
         query = query.filter_by(available=available)
 
-    results = [p.serialize() for p in query.all()]
-    return jsonify(results), status.HTTP_200_OK
+    # read-only, so skip the autoflush check of the session's dirty set
+    with db.session.no_autoflush:
+        # run the query and read the first batch before the 200 goes out, so a
+        # failing query still ends up as a 500; an error on a later batch can only
+        # cut the body short, leaving the client with truncated JSON
+        rows = iter(query.yield_per(STREAM_BATCH_SIZE))
+        first_batch = list(islice(rows, STREAM_BATCH_SIZE))
+
+    def generate(batch):
+        with db.session.no_autoflush:
+            separator = b""
+            yield b"["
+            while batch:
+                # encode a whole batch at once and drop its surrounding brackets
+                yield separator + orjson.dumps(Product.serialize_rows(batch))[1:-1]
+                separator = b","
+                batch = list(islice(rows, STREAM_BATCH_SIZE))
+            yield b"]"
+
+    return Response(stream_with_context(generate(first_batch)), status.HTTP_200_OK, mimetype="application/json")
 
 @app.route("/products/<int:product_id>", methods=["GET"])
 def get_products(product_id):
-    product = Product.query.get(product_id)
+    with db.session.no_autoflush:
+        product = db.session.get(Product, product_id)
     if not product:
         abort(status.HTTP_404_NOT_FOUND, f"Product with id '{product_id}' was not found.")
     return product.serialize(), status.HTTP_200_OK
 
 @app.route("/products/<int:product_id>", methods=["PUT"])
 def update_products(product_id):
-    check_content_type("application/json")
-    product = Product.query.get(product_id)
+    product = db.session.get(Product, product_id)
     if not product:
         abort(status.HTTP_404_NOT_FOUND, f"Product with id '{product_id}' was not found.")
     data = request.get_json()
@@ -77,8 +118,8 @@ def update_products(product_id):
 
 @app.route("/products/<int:product_id>", methods=["DELETE"])
 def delete_products(product_id):
-    product = Product.query.get(product_id)
+    product = db.session.get(Product, product_id)
     if product:
         db.session.delete(product)
         db.session.commit()
-    return "", status.HTTP_204_NO_CONTENT
+    return empty_204()
@@ -28,10 +28,14 @@ class ProductFactory(factory.Factory):
     available = FuzzyChoice(choices=[True, False])
     # Use Category Enum members, not strings
     category = FuzzyChoice(choices=[
-        Category.UNKNOWN,
-        Category.CLOTHS,
+        Category.ELECTRONICS,
+        Category.CLOTHING,
         Category.FOOD,
-        Category.HOUSEWARES,
-        Category.AUTOMOTIVE,
-        Category.TOOLS
-    ])
\ No newline at end of file
+        Category.BOOKS,
+        Category.OTHER
+    ])
+
+    @classmethod
+    def build_many(cls, count):
+        """Builds count unsaved products in one batch"""
+        return cls.build_batch(count)